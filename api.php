@@ -21,6 +21,83 @@ if (!$metodo) {
     resposta(false, null, 'Parametro "metodo" nao informado');
 }
 
+// Controle de admissao: um balde de fichas (token bucket) por cliente e por metodo.
+// Cada balde enche RECARGA_FICHAS_POR_SEGUNDO fichas/s ate CAPACIDADE_BALDE; cada
+// requisicao consome o custo do seu metodo. Metodos caros custam mais fichas, assim
+// um cliente inundando verificar_primo nao prende os workers do PHP e nao aumenta
+// a latencia das chamadas baratas (que usam baldes separados).
+const CAPACIDADE_BALDE = 30;
+const RECARGA_FICHAS_POR_SEGUNDO = 10;
+
+// Custo de cada metodo em fichas
+function custo_metodo($metodo) {
+    switch ($metodo) {
+        case 'verificar_primo':
+            // Divisao por tentativa: o custo cresce com o tamanho do numero.
+            // Acima do limite a API recusa sem calcular, entao custa o minimo.
+            $numero = intval($_GET['numero'] ?? $_POST['numero'] ?? 0);
+            if ($numero <= 10000 || $numero > 10000000) return 1;
+            if ($numero <= 1000000) return 3;
+            return 6;
+        case 'calcular_imc':
+        case 'fibonacci':
+        case 'analisar_senha':
+            return 1;
+        default:
+            return 0; // Metodo inexistente: responde o erro sem custo
+    }
+}
+
+// Consome fichas do balde; retorna 0 se admitido ou os segundos ate haver fichas
+function consumir_fichas($cliente, $metodo, $custo) {
+    $diretorio = sys_get_temp_dir() . DIRECTORY_SEPARATOR . 'api_esii_baldes';
+    if (!is_dir($diretorio) && !@mkdir($diretorio, 0700, true) && !is_dir($diretorio)) {
+        return 0; // Sem armazenamento: nao bloqueia a API
+    }
+
+    $arquivo = @fopen($diretorio . DIRECTORY_SEPARATOR . md5($cliente . '|' . $metodo), 'c+');
+    if ($arquivo === false) {
+        return 0;
+    }
+
+    // Trava exclusiva: requisicoes simultaneas do mesmo cliente/metodo sao serializadas
+    flock($arquivo, LOCK_EX);
+
+    $agora = microtime(true);
+    $estado = json_decode(stream_get_contents($arquivo), true);
+    $fichas = $estado['fichas'] ?? CAPACIDADE_BALDE;
+    $ultimo = $estado['ultimo'] ?? $agora;
+
+    $fichas = min(CAPACIDADE_BALDE, $fichas + ($agora - $ultimo) * RECARGA_FICHAS_POR_SEGUNDO);
+
+    $espera = 0;
+    if ($fichas >= $custo) {
+        $fichas -= $custo;
+    } else {
+        $espera = (int) ceil(($custo - $fichas) / RECARGA_FICHAS_POR_SEGUNDO);
+    }
+
+    ftruncate($arquivo, 0);
+    rewind($arquivo);
+    fwrite($arquivo, json_encode(['fichas' => $fichas, 'ultimo' => $agora]));
+    fflush($arquivo);
+    flock($arquivo, LOCK_UN);
+    fclose($arquivo);
+
+    return max(0, $espera);
+}
+
+$custo = custo_metodo($metodo);
+if ($custo > 0) {
+    $cliente = $_SERVER['REMOTE_ADDR'] ?? 'desconhecido';
+    $espera = consumir_fichas($cliente, $metodo, $custo);
+    if ($espera > 0) {
+        http_response_code(429);
+        header('Retry-After: ' . $espera);
+        resposta(false, null, 'Limite de requisicoes excedido para "' . $metodo . '". Tente novamente em ' . $espera . 's');
+    }
+}
+
 // MÉTODO 1: Calculadora de IMC
 if ($metodo === 'calcular_imc') {
     $peso = floatval($_GET['peso'] ?? $_POST['peso'] ?? 0);
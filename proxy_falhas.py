@@ -0,0 +1,205 @@
+"""
+Proxy Local de Injeção de Falhas para API - Teste de Caixa Preta
+Fica entre o APITester e o alvo e simula rede ruim por método da API:
+atraso fixo ou com variação, limite de banda, quedas de conexão,
+corpos truncados ou não-JSON e gotejamento (slow-loris)
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit, parse_qs
+
+import requests
+
+# Configuração
+TIMEOUT_ALVO = 30  # Timeout do proxy ao falar com o alvo real
+CORPO_NAO_JSON = b"<html><body><h1>502 Bad Gateway</h1></body></html>"
+INTERVALO_BANDA = 0.1  # Granularidade (s) do limitador de banda
+
+
+class Falha:
+    """Falhas injetadas nas respostas de um método (probabilidades entre 0 e 1)"""
+    def __init__(self, atraso: float = 0.0, variacao: float = 0.0, banda: int = 0,
+                 queda: float = 0.0, truncar: float = 0.0, nao_json: float = 0.0,
+                 gotejar: float = 0.0):
+        self.atraso = atraso        # Atraso fixo (s) antes de responder
+        self.variacao = variacao    # Variação aleatória (s) somada ao atraso: ±variacao
+        self.banda = banda          # Limite de banda (bytes/s); 0 = sem limite
+        self.queda = queda          # Probabilidade de fechar a conexão sem responder
+        self.truncar = truncar      # Probabilidade de fechar a conexão no meio do corpo
+        self.nao_json = nao_json    # Probabilidade de trocar o corpo por HTML
+        self.gotejar = gotejar      # Intervalo (s) entre bytes do corpo; 0 = desligado
+
+    @classmethod
+    def de_dict(cls, config: Dict[str, Any]) -> "Falha":
+        """Cria a falha a partir de um objeto JSON de configuração"""
+        return cls(**{chave.replace("-", "_"): valor for chave, valor in config.items()})
+
+
+class ProxyFalhas:
+    """Proxy HTTP que repassa requisições ao alvo injetando falhas por método"""
+
+    def __init__(self, alvo: str, falhas: Dict[str, Falha], porta: int = 0,
+                 semente: Optional[int] = None):
+        self.alvo = alvo
+        self.falhas = falhas  # Chave = nome do método; "*" vale para os demais
+        self.aleatorio = random.Random(semente)
+        self.trava = threading.Lock()
+        self.servidor = ThreadingHTTPServer(("127.0.0.1", porta), self._criar_handler())
+        self.servidor.daemon_threads = True
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """URL do proxy, preservando o caminho do alvo (ex.: /api.php)"""
+        caminho = urlsplit(self.alvo).path or "/"
+        return f"http://127.0.0.1:{self.servidor.server_address[1]}{caminho}"
+
+    def iniciar(self) -> str:
+        """Inicia o proxy em segundo plano e devolve sua URL"""
+        self.thread = threading.Thread(target=self.servidor.serve_forever, daemon=True)
+        self.thread.start()
+        return self.url
+
+    def parar(self):
+        """Encerra o proxy"""
+        self.servidor.shutdown()
+        self.servidor.server_close()
+
+    def sortear(self, probabilidade: float) -> bool:
+        """Sorteia um evento com a probabilidade dada"""
+        with self.trava:
+            return probabilidade > 0 and self.aleatorio.random() < probabilidade
+
+    def atraso(self, falha: Falha) -> float:
+        """Atraso fixo mais variação aleatória, nunca negativo"""
+        with self.trava:
+            variacao = self.aleatorio.uniform(-falha.variacao, falha.variacao) if falha.variacao else 0
+        return max(0.0, falha.atraso + variacao)
+
+    def falha_para(self, metodo: Optional[str]) -> Falha:
+        """Falha configurada para o método (ou a padrão "*")"""
+        return self.falhas.get(metodo or "", self.falhas.get("*", Falha()))
+
+    def _criar_handler(self):
+        proxy = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass  # Silencioso: o APITester já imprime os resultados
+
+            def do_GET(self):
+                self.repassar(None)
+
+            def do_POST(self):
+                tamanho = int(self.headers.get("Content-Length", 0))
+                self.repassar(self.rfile.read(tamanho))
+
+            def repassar(self, corpo: Optional[bytes]):
+                # Identifica o método da API pela query string ou pelo corpo do POST
+                query = urlsplit(self.path).query
+                params = parse_qs(query)
+                if corpo:
+                    params.update(parse_qs(corpo.decode("utf-8", "replace")))
+                falha = proxy.falha_para(params.get("metodo", [None])[0])
+
+                if proxy.sortear(falha.queda):
+                    self.close_connection = True
+                    return  # Fecha sem responder
+
+                url = proxy.alvo + (f"?{query}" if query else "")
+                try:
+                    if corpo is None:
+                        resposta = requests.get(url, timeout=TIMEOUT_ALVO)
+                    else:
+                        resposta = requests.post(url, data=corpo, timeout=TIMEOUT_ALVO, headers={
+                            "Content-Type": self.headers.get("Content-Type", "application/x-www-form-urlencoded")
+                        })
+                    status, conteudo = resposta.status_code, resposta.content
+                    cabecalhos = {k: v for k, v in resposta.headers.items()
+                                  if k.lower() in ("content-type", "retry-after")}
+                except requests.exceptions.RequestException as e:
+                    status, conteudo = 502, json.dumps({
+                        "sucesso": False, "dados": None, "mensagem": f"Proxy: alvo inacessível ({e})"
+                    }).encode()
+                    cabecalhos = {"Content-Type": "application/json"}
+
+                if proxy.sortear(falha.nao_json):
+                    conteudo = CORPO_NAO_JSON
+                truncar = proxy.sortear(falha.truncar)
+
+                time.sleep(proxy.atraso(falha))
+
+                try:
+                    self.send_response(status)
+                    for chave, valor in cabecalhos.items():
+                        self.send_header(chave, valor)
+                    # Content-Length sempre do corpo completo: no truncamento o cliente
+                    # recebe menos bytes que o anunciado e vê a conexão fechar (IncompleteRead)
+                    self.send_header("Content-Length", str(len(conteudo)))
+                    self.end_headers()
+                    if truncar:
+                        self.enviar(conteudo[:len(conteudo) // 2], falha)
+                        self.close_connection = True
+                    else:
+                        self.enviar(conteudo, falha)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # Cliente desistiu (ex.: timeout)
+
+            def enviar(self, conteudo: bytes, falha: Falha):
+                """Envia o corpo respeitando gotejamento e limite de banda"""
+                if falha.gotejar > 0:
+                    for i in range(len(conteudo)):
+                        self.wfile.write(conteudo[i:i + 1])
+                        self.wfile.flush()
+                        time.sleep(falha.gotejar)
+                elif falha.banda > 0:
+                    bloco = max(1, int(falha.banda * INTERVALO_BANDA))
+                    for i in range(0, len(conteudo), bloco):
+                        self.wfile.write(conteudo[i:i + bloco])
+                        self.wfile.flush()
+                        time.sleep(INTERVALO_BANDA)
+                else:
+                    self.wfile.write(conteudo)
+
+        return Handler
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Proxy local de injeção de falhas para a API")
+    parser.add_argument("--alvo", required=True, help="URL real da API (ex.: http://localhost:8000/api.php)")
+    parser.add_argument("--porta", type=int, default=8080, help="porta local do proxy")
+    parser.add_argument("--config", help="JSON com falhas por método: {\"verificar_primo\": {\"atraso\": 2}, \"*\": {...}}")
+    parser.add_argument("--semente", type=int, help="semente dos sorteios (execuções reprodutíveis)")
+    parser.add_argument("--atraso", type=float, default=0.0, help="atraso fixo (s)")
+    parser.add_argument("--variacao", type=float, default=0.0, help="variação do atraso (±s)")
+    parser.add_argument("--banda", type=int, default=0, help="limite de banda (bytes/s)")
+    parser.add_argument("--queda", type=float, default=0.0, help="probabilidade de derrubar a conexão")
+    parser.add_argument("--truncar", type=float, default=0.0, help="probabilidade de fechar a conexão no meio do corpo")
+    parser.add_argument("--nao-json", type=float, default=0.0, help="probabilidade de corpo não-JSON")
+    parser.add_argument("--gotejar", type=float, default=0.0, help="intervalo (s) entre bytes (slow-loris)")
+    args = parser.parse_args()
+
+    # Opções da linha de comando valem para todos os métodos; o arquivo pode sobrescrever por método
+    falhas = {"*": Falha(args.atraso, args.variacao, args.banda, args.queda,
+                         args.truncar, args.nao_json, args.gotejar)}
+    if args.config:
+        with open(args.config, encoding="utf-8") as arquivo:
+            falhas.update({metodo: Falha.de_dict(config) for metodo, config in json.load(arquivo).items()})
+
+    proxy = ProxyFalhas(args.alvo, falhas, args.porta, args.semente)
+    print(f"Proxy de falhas: {proxy.url} -> {args.alvo}")
+    try:
+        proxy.servidor.serve_forever()
+    except KeyboardInterrupt:
+        proxy.parar()
+
+
+if __name__ == "__main__":
+    main()
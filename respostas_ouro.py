@@ -0,0 +1,89 @@
+"""
+Repositório de Respostas de Ouro para API - Teste de Caixa Preta
+Índice em disco (SQLite) que mapeia o hash canônico de cada requisição para
+o envelope completo esperado, permitindo comparar respostas byte a byte
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+from typing import Dict, Any, Optional, Tuple
+
+# Configuração
+COMMIT_A_CADA = 1000  # Gravações acumuladas antes de cada commit
+CONTEXTO_DIFF = 24  # Bytes exibidos antes/depois da primeira diferença
+
+
+def hash_requisicao(params: Dict[str, Any], method: str = "GET") -> bytes:
+    """Hash canônico: método HTTP + parâmetros ordenados, com os valores como vão na requisição"""
+    canonica = json.dumps({
+        "http": method.upper(),
+        "params": {str(chave): str(valor) for chave, valor in params.items()},
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonica.encode("utf-8")).digest()
+
+
+def diff_bytes(esperado: Tuple[int, bytes], obtido: Tuple[int, bytes]) -> Optional[str]:
+    """Descreve a diferença entre dois envelopes (status, corpo); None se idênticos"""
+    if esperado == obtido:
+        return None
+
+    (status_esperado, corpo_esperado), (status_obtido, corpo_obtido) = esperado, obtido
+    partes = []
+    if status_esperado != status_obtido:
+        partes.append(f"Status {status_esperado} -> {status_obtido}")
+
+    if corpo_esperado != corpo_obtido:
+        # Primeiro byte divergente (ou fim do menor corpo)
+        offset = next((i for i, (a, b) in enumerate(zip(corpo_esperado, corpo_obtido)) if a != b),
+                      min(len(corpo_esperado), len(corpo_obtido)))
+        inicio, fim = max(0, offset - CONTEXTO_DIFF), offset + CONTEXTO_DIFF
+        partes.append(f"Byte {offset} (tamanhos {len(corpo_esperado)}/{len(corpo_obtido)}): "
+                      f"esperado {corpo_esperado[inicio:fim]!r}, obtido {corpo_obtido[inicio:fim]!r}")
+
+    return " | ".join(partes)
+
+
+class RespostasOuro:
+    """Índice em disco requisição -> envelope esperado, consultado por chave primária"""
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self.trava = threading.Lock()
+        self.pendentes = 0
+        self.conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self.conexao.execute("PRAGMA journal_mode=WAL")
+        self.conexao.execute("""
+            CREATE TABLE IF NOT EXISTS ouro (
+                hash BLOB PRIMARY KEY,
+                requisicao TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                corpo BLOB NOT NULL
+            ) WITHOUT ROWID
+        """)
+        self.conexao.commit()
+
+    def consultar(self, chave: bytes) -> Optional[Tuple[int, bytes]]:
+        """Envelope esperado (status, corpo) para o hash, ou None se não houver"""
+        with self.trava:
+            linha = self.conexao.execute(
+                "SELECT status, corpo FROM ouro WHERE hash = ?", (chave,)).fetchone()
+        return (linha[0], bytes(linha[1])) if linha else None
+
+    def gravar(self, chave: bytes, requisicao: str, status: int, corpo: bytes):
+        """Grava (ou re-abençoa) o envelope esperado de uma requisição"""
+        with self.trava:
+            self.conexao.execute(
+                "INSERT OR REPLACE INTO ouro (hash, requisicao, status, corpo) VALUES (?, ?, ?, ?)",
+                (chave, requisicao, status, corpo))
+            self.pendentes += 1
+            if self.pendentes >= COMMIT_A_CADA:
+                self.conexao.commit()
+                self.pendentes = 0
+
+    def fechar(self):
+        """Confirma gravações pendentes e fecha o arquivo"""
+        with self.trava:
+            self.conexao.commit()
+            self.conexao.close()
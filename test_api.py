@@ -3,16 +3,290 @@ Bateria de Testes Completa para API - Teste de Caixa Preta
 Testa todos os endpoints com casos válidos, inválidos, limites e exceções
 """
 
+import argparse
+import cProfile
+import email.utils
+import io
+import multiprocessing
+import os
+import pstats
+import queue
 import requests
 import sys
+import threading
 import time
-from typing import Dict, Any, List, Tuple
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from typing import Dict, Any, List, Tuple, Callable, Optional
 import math
 
+from proxy_falhas import Falha, ProxyFalhas
+from respostas_ouro import RespostasOuro, diff_bytes, hash_requisicao
+
 # Configuração
 API_URL = "http://136.248.121.230/api.php"
 TIMEOUT = 10
 DELAY_BETWEEN_TESTS = 0.1  # Delay entre requisições para não sobrecarregar
+MAX_DIVERGENCIAS_EXIBIDAS = 20  # Divergências entre alvos listadas no relatório
+MAX_TENTATIVAS_429 = 3  # Novas tentativas após HTTP 429 (respeitando Retry-After)
+MAX_ESPERA_429 = 30  # Maior espera (s) aceita de um Retry-After
+INTERVALO_AMOSTRAGEM = 0.005  # Intervalo (s) do amostrador de pilhas no modo perfil
+MAX_PASSOS_REDUCAO = 40  # Máximo de requisições gastas reduzindo uma entrada que falha
+LIMITE_PRIMO = 10000000  # Maior número aceito por verificar_primo
+MAIOR_PRIMO_ABAIXO_LIMITE = 9999991  # Laço de divisão por tentativa mais longo possível
+LIMITES_IMC = [18.5, 25, 30, 35, 40]  # Fronteiras das classificações de IMC
+
+
+def segundos_retry_after(valor: Optional[str]) -> float:
+    """Converte o cabeçalho Retry-After (segundos ou data HTTP) em segundos, limitado a
+    MAX_ESPERA_429; 1s se inválido ou não finito"""
+    if not valor:
+        return 1.0
+    try:
+        segundos = float(valor)
+    except ValueError:
+        try:
+            segundos = email.utils.parsedate_to_datetime(valor).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return 1.0
+    if not math.isfinite(segundos):
+        return 1.0
+    return min(MAX_ESPERA_429, max(0.0, segundos))
+
+
+def uniao_intervalos(intervalos: List[Tuple[float, float]]) -> float:
+    """Duração coberta pelos intervalos (início, fim); sobreposições contam uma vez só"""
+    total, fim_atual = 0.0, float("-inf")
+    for inicio, fim in sorted(intervalos):
+        if fim > fim_atual:
+            total += fim - max(inicio, fim_atual)
+            fim_atual = fim
+    return total
+
+
+def percentil(valores: List[float], p: float) -> float:
+    """Percentil p (0-100) pelo método do vizinho mais próximo"""
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    indice = max(0, math.ceil(p / 100 * len(ordenados)) - 1)
+    return ordenados[indice]
+
+
+# ---------------------------------------------------------------------------
+# Classes de equivalência: cada função ramo_* devolve o ramo de api.php que a
+# entrada exercita; eh_limite_* marca valores na fronteira entre dois ramos;
+# esperado_* é o oráculo usado para reduzir entradas que falham.
+# ---------------------------------------------------------------------------
+
+def valor_php(valor: float) -> float:
+    """Valor que o floatval() do PHP lê: inf/nan chegam como "inf"/"nan" e viram 0"""
+    return valor if math.isfinite(valor) else 0.0
+
+
+def ramo_imc(peso: float, altura: float) -> str:
+    """Ramo de calcular_imc exercitado pela entrada (erro ou classificação), como api.php a vê.
+    O ramo de valores não finitos do PHP não é alcançável com floats enviados pelo harness."""
+    peso, altura = valor_php(peso), valor_php(altura)
+    if peso > 1e100 or altura > 1e100:
+        return "overflow"
+    if (0 < peso < 1e-100) or (0 < altura < 1e-100):
+        return "underflow"
+    if peso <= 0 or altura <= 0:
+        return "nao_positivo"
+    
+    imc = peso / (altura * altura)
+    if imc < 18.5: return "Abaixo do peso"
+    if imc < 25: return "Peso normal"
+    if imc < 30: return "Sobrepeso"
+    if imc < 35: return "Obesidade grau I"
+    if imc < 40: return "Obesidade grau II"
+    return "Obesidade grau III"
+
+
+def eh_limite_imc(peso: float, altura: float) -> bool:
+    """IMC a menos de 0.05 de uma fronteira de classificação"""
+    if ramo_imc(peso, altura) in ("overflow", "underflow", "nao_positivo"):
+        return False
+    imc = peso / (altura * altura)
+    return any(abs(imc - limite) < 0.05 for limite in LIMITES_IMC)
+
+
+def esperado_imc(peso: float, altura: float) -> Tuple[bool, Optional[str]]:
+    """Resultado esperado de calcular_imc: (sucesso, classificacao)"""
+    ramo = ramo_imc(peso, altura)
+    if ramo in ("overflow", "underflow", "nao_positivo"):
+        return False, None
+    return True, ramo
+
+
+def ramo_primo(numero: int) -> str:
+    """Ramo de verificar_primo exercitado pela entrada"""
+    if numero < 2:
+        return "menor_que_2"
+    if numero > LIMITE_PRIMO:
+        return "acima_limite"
+    if numero == 2:
+        return "dois"
+    if numero % 2 == 0:
+        return "par"
+    if numero < 9:
+        return "impar_sem_laco"  # 3, 5 e 7: sqrt < 3, o laço não executa
+    if any(numero % i == 0 for i in range(3, math.isqrt(numero) + 1, 2)):
+        return "composto"
+    return "primo"
+
+
+def eh_limite_primo(numero: int) -> bool:
+    """Fronteiras de verificar_primo: 1/2/3, o limite de 10.000.000 (e o maior primo abaixo dele)
+    e quadrados ímpares (i <= sqrt)"""
+    if numero in (0, 1, 2, 3, MAIOR_PRIMO_ABAIXO_LIMITE, LIMITE_PRIMO, LIMITE_PRIMO + 1):
+        return True
+    return 9 <= numero <= LIMITE_PRIMO and numero % 2 == 1 and math.isqrt(numero) ** 2 == numero
+
+
+def esperado_primo(numero: int) -> Tuple[bool, Optional[bool]]:
+    """Resultado esperado de verificar_primo: (sucesso, primo)"""
+    ramo = ramo_primo(numero)
+    if ramo == "acima_limite":
+        return False, None
+    return True, ramo in ("dois", "impar_sem_laco", "primo")
+
+
+def ramo_fibonacci(quantidade: int) -> str:
+    """Ramo de fibonacci exercitado pela entrada"""
+    if quantidade < 1:
+        return "menor_que_1"
+    if quantidade > 50:
+        return "acima_50"
+    if quantidade <= 2:
+        return f"sem_laco_{quantidade}"  # Só fatia o vetor inicial [0, 1]
+    return "laco"
+
+
+def eh_limite_fibonacci(quantidade: int) -> bool:
+    """Fronteiras de fibonacci: 0/1, 2/3 (início do laço) e 50/51"""
+    return quantidade in (0, 1, 2, 3, 49, 50, 51)
+
+
+def esperado_fibonacci(quantidade: int) -> Tuple[bool, Optional[List[int]]]:
+    """Resultado esperado de fibonacci: (sucesso, sequencia)"""
+    if quantidade < 1 or quantidade > 50:
+        return False, None
+    fib = [0, 1]
+    for i in range(2, quantidade):
+        fib.append(fib[i-1] + fib[i-2])
+    return True, fib[:quantidade]
+
+
+def planejar_casos(casos: List[tuple], ramo: Callable[[tuple], str],
+                   limite: Callable[[tuple], bool]) -> Tuple[List[tuple], int]:
+    """Cobertura mínima: o primeiro caso de cada ramo mais todos os valores limite"""
+    ramos = set()
+    plano = []
+    for caso in casos:
+        r = ramo(caso)
+        if r not in ramos or limite(caso):
+            ramos.add(r)
+            plano.append(caso)
+    return plano, len(ramos)
+
+
+def _ordem_reducao(valor) -> Tuple[float, bool]:
+    """Ordem de simplicidade: menor módulo primeiro, positivo antes de negativo"""
+    return (abs(valor), valor < 0) if not math.isnan(valor) else (math.inf, True)
+
+
+def candidatos_inteiros(valor: int) -> List[int]:
+    """Candidatos mais simples que valor: 0, depois aproximando de valor por bisseção"""
+    modulo = abs(valor)
+    sinal = 1 if valor > 0 else -1
+    candidatos = [0, modulo]
+    passo = modulo // 2
+    while passo > 0:
+        candidatos.append(sinal * (modulo - passo))
+        passo //= 2
+    return [c for c in dict.fromkeys(candidatos) if _ordem_reducao(c) < _ordem_reducao(valor)]
+
+
+def candidatos_reais(valor: float) -> List[float]:
+    """Candidatos mais simples que valor: inteiros e bisseção em centésimos"""
+    if not math.isfinite(valor * 100):
+        return [0.0, 1.0]
+    candidatos = [float(math.trunc(valor))]
+    candidatos += [c / 100 for c in candidatos_inteiros(round(valor * 100))]
+    return [c for c in dict.fromkeys(candidatos) if _ordem_reducao(c) < _ordem_reducao(valor)]
+
+
+class AmostradorPilhas:
+    """Amostra periodicamente a pilha de todas as threads e acumula pilhas colapsadas (flame graph).
+    A raiz de cada pilha indica se veio da thread principal ou de uma thread trabalhadora."""
+    def __init__(self, thread_principal: int, intervalo: float = INTERVALO_AMOSTRAGEM):
+        self.thread_principal = thread_principal
+        self.intervalo = intervalo
+        self.pilhas: Dict[str, int] = {}
+        self.parar = threading.Event()
+        self.thread = threading.Thread(target=self._amostrar, daemon=True)
+    
+    def __enter__(self):
+        self.thread.start()
+        return self
+    
+    def __exit__(self, *exc):
+        self.parar.set()
+        self.thread.join()
+    
+    def _amostrar(self):
+        proprio = threading.get_ident()
+        while not self.parar.wait(self.intervalo):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == proprio:
+                    continue
+                quadros = []
+                while frame is not None:
+                    codigo = frame.f_code
+                    quadros.append(f"{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{codigo.co_firstlineno})")
+                    frame = frame.f_back
+                quadros.append("principal" if thread_id == self.thread_principal else "trabalhador")
+                pilha = ";".join(reversed(quadros))
+                self.pilhas[pilha] = self.pilhas.get(pilha, 0) + 1
+    
+    def salvar(self, caminho: str):
+        """Grava no formato colapsado do flamegraph.pl / speedscope: 'a;b;c contagem'"""
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            for pilha, contagem in sorted(self.pilhas.items()):
+                arquivo.write(f"{pilha} {contagem}\n")
+
+
+def inundar_alvos(alvos: List[str], params: Dict[str, Any], trabalhadores: int,
+                  pronto, parar, fila):
+    """Processo de inundação: dispara params contra os alvos até 'parar' e devolve o resumo
+    (enviadas, limitadas com 429, envelopes válidos) na fila. Roda em processo separado
+    para não disputar o GIL com as medições de latência."""
+    tester = APITester(alvos=alvos)
+    
+    def trabalhador() -> List[Dict[str, Any]]:
+        respostas = []
+        while not parar.is_set():
+            respostas.append(tester.make_request(params, respeitar_retry_after=False,
+                                                 conferir_ouro=False))
+        return respostas
+    
+    with ThreadPoolExecutor(max_workers=trabalhadores) as executor:
+        futuros = [executor.submit(trabalhador) for _ in range(trabalhadores)]
+        pronto.set()
+        respostas = [r for futuro in futuros for r in futuro.result()]
+    
+    # A inundação deve ser limitada com 429 + Retry-After + envelope padrão
+    limitadas = [r for r in respostas if r["success"] and r["status_code"] == 429]
+    envelope_ok = all(
+        r["retry_after"] and r["data"] is not None
+        and r["data"].get("sucesso") is False and "dados" in r["data"]
+        and r["data"].get("dados") is None and r["data"].get("mensagem")
+        for r in limitadas
+    )
+    fila.put((len(respostas), len(limitadas), envelope_ok))
 
 
 class TestResult:
@@ -27,34 +301,159 @@ class TestResult:
 class APITester:
     """Classe principal para testes da API"""
     
-    def __init__(self):
+    def __init__(self, reduzir_casos: bool = True, reduzir_falhas: bool = True,
+                 alvos: Optional[List[str]] = None, testar_falhas: bool = False,
+                 testar_limite: bool = False,
+                 perfil: Optional[str] = None, ouro: Optional[str] = None,
+                 abencoar: bool = False):
         self.results: List[TestResult] = []
         self.total_tests = 0
         self.passed_tests = 0
         self.failed_tests = 0
+        self.reduzir_casos = reduzir_casos  # Executa só a cobertura mínima das tabelas
+        self.reduzir_falhas = reduzir_falhas  # Reduz entradas que falham ao menor valor
+        self.testar_falhas = testar_falhas  # Roda a suíte de falhas de rede via proxy local
+        self.testar_limite = testar_limite  # Roda a suíte de inundação do limitador (429)
+        self.timeout = TIMEOUT
+        
+        # Modo perfil: diretório de saída e contadores para separar cliente de servidor
+        self.perfil = perfil
+        self.perfis: List[Dict[str, Any]] = []
+        self.requisicoes_enviadas = 0
+        self.intervalos_rede: List[Tuple[float, float]] = []  # (início, fim) de servidor + rede
+        self.trava_contadores = threading.Lock()
+        
+        # Respostas de ouro: compara cada resposta de referência com o envelope gravado
+        # (ou grava o envelope atual, no modo abençoar)
+        self.ouro = RespostasOuro(ouro) if ouro else None
+        self.abencoar = abencoar
+        self.divergencias_ouro: List[Tuple[str, str]] = []
+        self.ouro_conferidas = 0
+        self.ouro_ausentes = 0
+        self.ouro_gravadas = 0
+        
+        # Alvos: o primeiro é o de referência (suas respostas validam os casos);
+        # os demais recebem as mesmas requisições em paralelo para comparação
+        self.alvos = alvos or [API_URL]
+        self.latencias: Dict[str, List[float]] = {alvo: [] for alvo in self.alvos}
+        self.erros_alvo: Dict[str, int] = {alvo: 0 for alvo in self.alvos}
+        self.divergencias: List[Tuple[str, Dict[str, Any]]] = []
         
-    def make_request(self, params: Dict[str, Any], method: str = "GET") -> Dict[str, Any]:
-        """Faz requisição à API com tratamento de erros"""
+    def make_request(self, params: Dict[str, Any], method: str = "GET",
+                     respeitar_retry_after: bool = True, conferir_ouro: bool = True) -> Dict[str, Any]:
+        """Faz requisição a todos os alvos e devolve a resposta do alvo de referência"""
+        if len(self.alvos) == 1:
+            referencia = self._requisitar(self.alvos[0], params, method, respeitar_retry_after)
+        else:
+            # Executor próprio por chamada: chamadores concorrentes (ex.: a inundação de
+            # test_rate_limit) nunca esperam na fila uns dos outros
+            with ThreadPoolExecutor(max_workers=len(self.alvos)) as executor:
+                futuros = [executor.submit(self._requisitar, alvo, params, method, respeitar_retry_after)
+                           for alvo in self.alvos]
+                respostas = {alvo: futuro.result() for alvo, futuro in zip(self.alvos, futuros)}
+            
+            # Compara o envelope completo (status HTTP, corpo JSON e erro) com a referência.
+            # Respostas 429 dependem do estado do limitador de cada alvo e não são comparadas.
+            referencia = respostas[self.alvos[0]]
+            def envelope(r: Dict[str, Any]) -> tuple:
+                return (r.get("status_code"), r["data"], r["error"])
+            limitada = any(r.get("status_code") == 429 for r in respostas.values())
+            if not limitada and any(envelope(r) != envelope(referencia) for r in respostas.values()):
+                self.divergencias.append((f"{method.upper()} {params}", respostas))
+        
+        if self.ouro is not None and conferir_ouro:
+            self.conferir_ouro(params, method, referencia)
+        
+        return referencia
+    
+    def conferir_ouro(self, params: Dict[str, Any], method: str, response: Dict[str, Any]):
+        """Confere (ou abençoa) a resposta contra o envelope de ouro; marca response["ouro"]"""
+        response["ouro"] = None  # None = não conferida
+        if not response["success"] or response["status_code"] == 429:
+            return
+        
+        chave = hash_requisicao(params, method)
+        obtido = (response["status_code"], response["corpo"])
+        requisicao = f"{method.upper()} {params}"
+        
+        if self.abencoar:
+            self.ouro.gravar(chave, requisicao, *obtido)
+            self.ouro_gravadas += 1
+            return
+        
+        esperado = self.ouro.consultar(chave)
+        if esperado is None:
+            self.ouro_ausentes += 1
+            return
+        
+        self.ouro_conferidas += 1
+        diff = diff_bytes(esperado, obtido)
+        response["ouro"] = diff is None
+        response["diff_ouro"] = diff
+        if diff is not None:
+            self.divergencias_ouro.append((requisicao, diff))
+    
+    def _requisitar(self, alvo: str, params: Dict[str, Any], method: str,
+                    respeitar_retry_after: bool, registrar: bool = True) -> Dict[str, Any]:
+        """Faz requisição a um alvo com tratamento de erros; com registrar=False a latência
+        não entra na comparação entre alvos (ex.: sondagens da redução de entradas)"""
+        latencia, erro = None, None
         try:
-            if method.upper() == "GET":
-                response = requests.get(API_URL, params=params, timeout=TIMEOUT)
-            else:
-                response = requests.post(API_URL, data=params, timeout=TIMEOUT)
+            for tentativa in range(MAX_TENTATIVAS_429 + 1):
+                inicio = time.perf_counter()
+                response = None
+                try:
+                    if method.upper() == "GET":
+                        response = requests.get(alvo, params=params, timeout=self.timeout)
+                    else:
+                        response = requests.post(alvo, data=params, timeout=self.timeout)
+                finally:
+                    latencia = time.perf_counter() - inicio
+                    # Servidor + rede: até a chegada dos cabeçalhos (response.elapsed, sem o
+                    # custo do requests no cliente); sem resposta, o tempo até a falha
+                    self._registrar_rede(inicio, response.elapsed.total_seconds()
+                                         if response is not None else latencia)
+                
+                # Limite de requisições: aguarda o tempo pedido pela API e tenta de novo
+                retry_after = response.headers.get("Retry-After")
+                if (response.status_code != 429 or not respeitar_retry_after
+                        or tentativa == MAX_TENTATIVAS_429):
+                    break
+                time.sleep(segundos_retry_after(retry_after))
             
             return {
                 "success": True,
                 "status_code": response.status_code,
+                "retry_after": retry_after,
+                "corpo": response.content,
                 "data": response.json() if response.text else None,
                 "error": None
             }
         except requests.exceptions.Timeout:
-            return {"success": False, "error": "Timeout", "data": None}
+            erro = "Timeout"
+        except requests.exceptions.ChunkedEncodingError:
+            erro = "Incomplete Response"  # Conexão fechada antes do Content-Length anunciado
         except requests.exceptions.ConnectionError:
-            return {"success": False, "error": "Connection Error", "data": None}
+            erro = "Connection Error"
         except requests.exceptions.JSONDecodeError:
-            return {"success": False, "error": "Invalid JSON", "data": None}
+            erro = "Invalid JSON"
         except Exception as e:
-            return {"success": False, "error": str(e), "data": None}
+            erro = str(e)
+        finally:
+            # A última tentativa conta mesmo quando falha: um alvo que estoura o timeout
+            # não pode parecer mais rápido que os demais
+            if registrar and alvo in self.latencias and latencia is not None:
+                with self.trava_contadores:
+                    self.latencias[alvo].append(latencia)
+                    if erro is not None:
+                        self.erros_alvo[alvo] += 1
+        return {"success": False, "error": erro, "data": None}
+    
+    def _registrar_rede(self, inicio: float, duracao: float):
+        """Conta uma requisição HTTP e o intervalo que ela passou no servidor/rede"""
+        with self.trava_contadores:
+            self.requisicoes_enviadas += 1
+            self.intervalos_rede.append((inicio, inicio + duracao))
     
     def add_result(self, name: str, passed: bool, message: str, details: str = ""):
         """Adiciona resultado de teste"""
@@ -73,6 +472,174 @@ class APITester:
         if details and not passed:
             print(f"  Detalhes: {details}")
     
+    def planejar(self, casos: List[tuple], ramo: Callable[[tuple], str],
+                 limite: Callable[[tuple], bool]) -> List[tuple]:
+        """Seleciona os casos a executar conforme o modo (cobertura mínima ou tabela completa)"""
+        if not self.reduzir_casos:
+            return casos
+        plano, num_ramos = planejar_casos(casos, ramo, limite)
+        print(f"Plano: {len(plano)} de {len(casos)} casos ({num_ramos} ramos + valores limite)")
+        return plano
+    
+    def reduzir_falha(self, entrada: Dict[str, Any],
+                      falha: Callable[[Dict[str, Any]], bool]) -> str:
+        """Reduz uma entrada que falha ao menor valor que ainda falha, parâmetro a parâmetro.
+        As sondagens vão só ao alvo de referência e não são conferidas com as respostas de ouro."""
+        if not self.reduzir_falhas or not falha(entrada):
+            return ""
+        
+        passos = 1
+        for chave, valor in entrada.items():
+            candidatos = candidatos_inteiros if isinstance(valor, int) else candidatos_reais
+            melhorou = True
+            while melhorou and passos < MAX_PASSOS_REDUCAO:
+                melhorou = False
+                for candidato in candidatos(entrada[chave]):
+                    if passos >= MAX_PASSOS_REDUCAO:
+                        break
+                    passos += 1
+                    if falha({**entrada, chave: candidato}):
+                        entrada = {**entrada, chave: candidato}
+                        melhorou = True
+                        break
+        
+        reduzida = ", ".join(f"{k}={v}" for k, v in entrada.items())
+        return f" | Menor entrada que falha: {reduzida} ({passos} requisições)"
+    
+    def _falha_imc(self, entrada: Dict[str, Any]) -> bool:
+        """Confere calcular_imc contra o oráculo local"""
+        response = self._requisitar(self.alvos[0], {"metodo": "calcular_imc", **entrada}, "GET", True,
+                                    registrar=False)
+        if not response["success"] or response["data"] is None:
+            return False
+        data = response["data"]
+        sucesso, classificacao = esperado_imc(entrada["peso"], entrada["altura"])
+        if data.get("sucesso") != sucesso:
+            return True
+        return sucesso and (data.get("dados") or {}).get("classificacao") != classificacao
+    
+    def _falha_primo(self, entrada: Dict[str, Any]) -> bool:
+        """Confere verificar_primo contra o oráculo local"""
+        response = self._requisitar(self.alvos[0], {"metodo": "verificar_primo", **entrada}, "GET", True,
+                                    registrar=False)
+        if not response["success"] or response["data"] is None:
+            return False
+        data = response["data"]
+        sucesso, primo = esperado_primo(entrada["numero"])
+        if data.get("sucesso") != sucesso:
+            return True
+        return sucesso and (data.get("dados") or {}).get("primo") != primo
+    
+    def _falha_fibonacci(self, entrada: Dict[str, Any]) -> bool:
+        """Confere fibonacci contra o oráculo local"""
+        response = self._requisitar(self.alvos[0], {"metodo": "fibonacci", **entrada}, "GET", True,
+                                    registrar=False)
+        if not response["success"] or response["data"] is None:
+            return False
+        data = response["data"]
+        sucesso, sequencia = esperado_fibonacci(entrada["quantidade"])
+        if data.get("sucesso") != sucesso:
+            return True
+        return sucesso and (data.get("dados") or {}).get("sequencia") != sequencia
+    
+    def _marcar_estado(self) -> Dict[str, Any]:
+        """Tamanho atual de resultados e contadores, para desfazer uma passada de suíte"""
+        with self.trava_contadores:
+            return {
+                "results": len(self.results),
+                "contagens": (self.total_tests, self.passed_tests, self.failed_tests),
+                "divergencias": len(self.divergencias),
+                "divergencias_ouro": len(self.divergencias_ouro),
+                "ouro": (self.ouro_conferidas, self.ouro_ausentes, self.ouro_gravadas),
+                "latencias": {alvo: len(valores) for alvo, valores in self.latencias.items()},
+                "erros_alvo": dict(self.erros_alvo),
+                "requisicoes": self.requisicoes_enviadas,
+                "intervalos_rede": len(self.intervalos_rede),
+            }
+    
+    def _restaurar_estado(self, estado: Dict[str, Any]):
+        """Descarta tudo o que foi registrado depois de _marcar_estado"""
+        with self.trava_contadores:
+            del self.results[estado["results"]:]
+            self.total_tests, self.passed_tests, self.failed_tests = estado["contagens"]
+            del self.divergencias[estado["divergencias"]:]
+            del self.divergencias_ouro[estado["divergencias_ouro"]:]
+            self.ouro_conferidas, self.ouro_ausentes, self.ouro_gravadas = estado["ouro"]
+            for alvo, tamanho in estado["latencias"].items():
+                del self.latencias[alvo][tamanho:]
+            self.erros_alvo = dict(estado["erros_alvo"])
+            self.requisicoes_enviadas = estado["requisicoes"]
+            del self.intervalos_rede[estado["intervalos_rede"]:]
+    
+    def executar_suite(self, suite: Callable[[], None], perfilar: bool = True):
+        """Executa uma suíte; no modo perfil mede tempo, rede e CPU do cliente numa passada
+        normal e depois repete a suíte sob os profilers só para gerar .prof/.folded e o pico
+        de memória. perfilar=False deixa de fora suítes com threads que não são do cliente
+        (proxy local) ou sensíveis a latência (inundação)."""
+        if not self.perfil or not perfilar:
+            suite()
+            return
+        
+        nome = suite.__name__
+        os.makedirs(self.perfil, exist_ok=True)
+        
+        # 1ª passada, sem profilers: é a que vale para resultados e números do relatório
+        estado = self._marcar_estado()
+        inicio_cpu, inicio = time.process_time(), time.perf_counter()
+        try:
+            suite()
+        finally:
+            cpu, elapsed = time.process_time() - inicio_cpu, time.perf_counter() - inicio
+            requisicoes = self.requisicoes_enviadas - estado["requisicoes"]
+            rede = uniao_intervalos(self.intervalos_rede[estado["intervalos_rede"]:])
+        
+        # 2ª passada, sob os profilers: saída e resultados descartados.
+        # Até o Python 3.11 o cProfile só vê a thread que o ativou: cada thread
+        # trabalhadora (fan-out entre alvos) ganha o seu próprio perfil.
+        # A partir do 3.12 ele usa sys.monitoring e um único perfil já vê todas.
+        profiler = cProfile.Profile()
+        perfis_threads: List[cProfile.Profile] = []
+        trava_perfis = threading.Lock()
+        
+        def perfilar_thread(*_):
+            perfil_thread = cProfile.Profile()
+            with trava_perfis:
+                perfis_threads.append(perfil_thread)
+            perfil_thread.enable()  # Substitui este gancho na thread atual
+        
+        estado = self._marcar_estado()
+        tracemalloc.start()
+        try:
+            with AmostradorPilhas(threading.get_ident()) as amostrador, redirect_stdout(io.StringIO()):
+                if sys.version_info < (3, 12):
+                    threading.setprofile(perfilar_thread)
+                try:
+                    profiler.runcall(suite)
+                finally:
+                    threading.setprofile(None)
+        finally:
+            _, pico_memoria = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self._restaurar_estado(estado)
+            
+            estatisticas = pstats.Stats(profiler)
+            with trava_perfis:
+                for perfil_thread in perfis_threads:
+                    estatisticas.add(perfil_thread)
+            estatisticas.dump_stats(os.path.join(self.perfil, f"{nome}.prof"))
+            amostrador.salvar(os.path.join(self.perfil, f"{nome}.folded"))
+            
+            self.perfis.append({
+                "suite": nome,
+                "requisicoes": requisicoes,
+                "tempo": elapsed,
+                "rede": rede,
+                "cliente": elapsed - rede,
+                "cpu": cpu,
+                "cpu_por_requisicao": cpu / requisicoes if requisicoes else 0.0,
+                "pico_memoria": pico_memoria,
+            })
+    
     def test_no_method(self):
         """Teste: Requisição sem método"""
         print("\n=== TESTANDO: Requisição sem método ===")
@@ -171,7 +738,14 @@ class APITester:
             (107.0, 1.75, True, "IMC = 35 (Limite obesidade II)"),
             (122.5, 1.75, True, "IMC = 40 (Limite obesidade III)"),
             (150.0, 1.75, True, "IMC > 40 (Obesidade III)"),
+            
+            # Fronteiras exatas (altura 2.0: IMC = peso / 4 sem erro de arredondamento)
+            *[(limite * 4 - 0.01, 2.0, True, f"IMC logo abaixo de {limite}") for limite in LIMITES_IMC],
+            *[(limite * 4, 2.0, True, f"IMC exatamente {limite}") for limite in LIMITES_IMC],
+            *[(limite * 4 + 0.01, 2.0, True, f"IMC logo acima de {limite}") for limite in LIMITES_IMC],
         ]
+        test_cases = self.planejar(test_cases, lambda c: ramo_imc(c[0], c[1]),
+                                   lambda c: eh_limite_imc(c[0], c[1]))
         
         for peso, altura, esperado_sucesso, descricao in test_cases:
             params = {"metodo": "calcular_imc", "peso": peso, "altura": altura}
@@ -198,9 +772,18 @@ class APITester:
                 imc = data["dados"].get("imc", "N/A")
                 classificacao = data["dados"].get("classificacao", "N/A")
                 details += f", IMC={imc}, Classificação={classificacao}"
+                
+                # Confere a classificação contra o oráculo (fronteiras inclusive)
+                classificacao_esperada = esperado_imc(peso, altura)[1]
+                if classificacao_esperada and classificacao != classificacao_esperada:
+                    details += f", Esperado={classificacao_esperada}"
+                    passed = False
             else:
                 details += f", Mensagem={data.get('mensagem', 'N/A')}"
             
+            if not passed:
+                details += self.reduzir_falha({"peso": peso, "altura": altura}, self._falha_imc)
+            
             self.add_result(f"IMC: {descricao}", passed,
                            "Resultado esperado" if passed else "Resultado incorreto",
                            details)
@@ -242,7 +825,15 @@ class APITester:
             # Valores extremos
             (10**6, False, "1 milhão"),
             (10**6 + 3, True, "1000003 (primo)"),
+            
+            # Fronteiras
+            (25, False, "Quadrado de primo 25 (i = sqrt)"),
+            (MAIOR_PRIMO_ABAIXO_LIMITE, True, "Maior primo abaixo do limite"),
+            (LIMITE_PRIMO, False, "Limite exato (10.000.000)"),
+            (LIMITE_PRIMO + 1, False, "Logo acima do limite (10.000.001)"),
         ]
+        test_cases = self.planejar(test_cases, lambda c: ramo_primo(c[0]),
+                                   lambda c: eh_limite_primo(c[0]))
         
         for numero, esperado_primo, descricao in test_cases:
             params = {"metodo": "verificar_primo", "numero": numero}
@@ -261,16 +852,21 @@ class APITester:
                 passed = (eh_primo == esperado_primo)
                 
                 details = f"Número={numero}, Esperado Primo={esperado_primo}, Obtido={eh_primo}"
+                if not passed:
+                    details += self.reduzir_falha({"numero": numero}, self._falha_primo)
                 
                 self.add_result(f"Primo: {descricao}", passed,
                                "Resultado correto" if passed else "Resultado incorreto",
                                details)
             else:
                 # Para números inválidos (negativos, muito grandes, etc), espera-se erro
-                passed = (numero < 2 or numero > 10000000 or not esperado_primo)
+                passed = (numero < 2 or numero > LIMITE_PRIMO or not esperado_primo)
+                details = f"Mensagem: {data.get('mensagem', 'N/A')}"
+                if not passed:
+                    details += self.reduzir_falha({"numero": numero}, self._falha_primo)
                 self.add_result(f"Primo: {descricao}", passed,
                                "Erro tratado corretamente" if passed else "Comportamento inesperado",
-                               f"Mensagem: {data.get('mensagem', 'N/A')}")
+                               details)
             
             time.sleep(DELAY_BETWEEN_TESTS)
         
@@ -309,6 +905,7 @@ class APITester:
             # (quantidade, esperado_sucesso, descricao)
             (1, True, "Quantidade mínima (1)"),
             (2, True, "Quantidade 2"),
+            (3, True, "Quantidade 3 (primeira iteração do laço)"),
             (5, True, "Quantidade 5"),
             (10, True, "Quantidade padrão (10)"),
             (25, True, "Quantidade 25"),
@@ -327,6 +924,8 @@ class APITester:
             (sys.maxsize, False, "Int máximo do sistema"),
             (-sys.maxsize, False, "Int mínimo do sistema"),
         ]
+        test_cases = self.planejar(test_cases, lambda c: ramo_fibonacci(c[0]),
+                                   lambda c: eh_limite_fibonacci(c[0]))
         
         for quantidade, esperado_sucesso, descricao in test_cases:
             params = {"metodo": "fibonacci", "quantidade": quantidade}
@@ -372,6 +971,9 @@ class APITester:
             else:
                 details += f", Mensagem={data.get('mensagem', 'N/A')}"
             
+            if not passed:
+                details += self.reduzir_falha({"quantidade": quantidade}, self._falha_fibonacci)
+            
             self.add_result(f"Fibonacci: {descricao}", passed,
                            "Resultado esperado" if passed else "Resultado incorreto",
                            details)
@@ -599,12 +1201,17 @@ class APITester:
             sucesso = data.get("sucesso", True)
             mensagem = data.get("mensagem", "")
             
-            # Se retornou erro OU processou com valor padrão, considera OK
-            passed = True  # API está lidando com o caso, mesmo que seja processando como 0
+            # Se retornou erro OU processou com valor padrão, considera OK,
+            # desde que o envelope não tenha mudado em relação à resposta de ouro
+            passed = response.get("ouro") is not False
+            
+            details = f"Mensagem: {mensagem}"
+            if not passed:
+                details += f" | Ouro: {response['diff_ouro']}"
             
             self.add_result(f"{metodo}: Sem parâmetro '{param}'", passed,
                            f"Tratado: Sucesso={sucesso}",
-                           f"Mensagem: {mensagem}")
+                           details)
             
             time.sleep(DELAY_BETWEEN_TESTS)
     
@@ -662,6 +1269,63 @@ class APITester:
                        f"{success_count}/{num_requests} sucesso em {elapsed:.2f}s",
                        f"Taxa: {num_requests/elapsed:.2f} req/s")
     
+    def test_falhas_rede(self):
+        """Testa timeouts, erros e vazão sob falhas de rede injetadas pelo proxy local"""
+        print("\n=== TESTANDO: Falhas de Rede (proxy local) ===")
+        
+        timeout_curto = 2  # Timeout reduzido para os cenários não demorarem TIMEOUT segundos
+        num_requisicoes = 5
+        params = {"metodo": "fibonacci", "quantidade": 50}  # Corpo de ~500 bytes
+        
+        cenarios = [
+            # (descricao, falhas por método, params, erro esperado ou None para sucesso)
+            ("Sem falhas (referência)", {}, params, None),
+            ("Atraso fixo 0.5s", {"fibonacci": Falha(atraso=0.5)}, params, None),
+            ("Atraso com variação 0.3s ±0.2s", {"fibonacci": Falha(atraso=0.3, variacao=0.2)}, params, None),
+            ("Atraso acima do timeout", {"fibonacci": Falha(atraso=timeout_curto + 1)}, params, "Timeout"),
+            ("Banda de 1 KB/s", {"fibonacci": Falha(banda=1000)}, params, None),
+            ("Conexão derrubada", {"fibonacci": Falha(queda=1.0)}, params, "Connection Error"),
+            ("Corpo truncado", {"fibonacci": Falha(truncar=1.0)}, params, "Incomplete Response"),
+            ("Corpo não-JSON", {"fibonacci": Falha(nao_json=1.0)}, params, "Invalid JSON"),
+            ("Gotejamento (slow-loris) 5ms/byte", {"fibonacci": Falha(gotejar=0.005)}, params, None),
+            ("Falha só em verificar_primo", {"verificar_primo": Falha(queda=1.0)}, params, None),
+        ]
+        
+        timeout_original = self.timeout
+        self.timeout = timeout_curto
+        try:
+            for descricao, falhas, request_params, erro_esperado in cenarios:
+                proxy = ProxyFalhas(self.alvos[0], falhas, semente=0)
+                url = proxy.iniciar()
+                
+                erros: Dict[str, int] = {}
+                latencias = []
+                inicio = time.perf_counter()
+                try:
+                    for _ in range(num_requisicoes):
+                        t0 = time.perf_counter()
+                        response = self._requisitar(url, request_params, "GET", True)
+                        latencias.append(time.perf_counter() - t0)
+                        if not response["success"]:
+                            erros[response["error"]] = erros.get(response["error"], 0) + 1
+                        elif not response["data"] or not response["data"].get("sucesso"):
+                            erros["Resposta sem sucesso"] = erros.get("Resposta sem sucesso", 0) + 1
+                finally:
+                    proxy.parar()
+                elapsed = time.perf_counter() - inicio
+                
+                if erro_esperado is None:
+                    passed = not erros
+                else:
+                    passed = erros == {erro_esperado: num_requisicoes}
+                
+                self.add_result(f"Falhas: {descricao}", passed,
+                               f"{num_requisicoes/elapsed:.2f} req/s, p50={percentil(latencias, 50)*1000:.0f}ms, "
+                               f"máx={max(latencias)*1000:.0f}ms",
+                               f"Esperado={erro_esperado or 'sucesso'}, Erros={erros or 'nenhum'}")
+        finally:
+            self.timeout = timeout_original
+    
     def test_special_characters(self):
         """Testa caracteres especiais e encoding"""
         print("\n=== TESTANDO: Caracteres Especiais e Encoding ===")
@@ -689,21 +1353,96 @@ class APITester:
             
             if response["success"]:
                 data = response["data"]
-                # API deve processar ou rejeitar graciosamente
-                self.add_result(f"Caracteres especiais: '{special_str[:20]}'", True,
-                               f"Processado: {data.get('sucesso', 'N/A')}")
+                # API deve processar ou rejeitar graciosamente, com o mesmo envelope da resposta de ouro
+                passed = response.get("ouro") is not False
+                self.add_result(f"Caracteres especiais: '{special_str[:20]}'", passed,
+                               f"Processado: {data.get('sucesso', 'N/A') if data else 'N/A'}",
+                               f"Ouro: {response.get('diff_ouro')}")
             else:
                 self.add_result(f"Caracteres especiais: '{special_str[:20]}'", True,
                                f"Erro tratado: {response['error']}")
             
             time.sleep(DELAY_BETWEEN_TESTS)
     
+    def test_rate_limit(self):
+        """Testa o controle de admissão: inundar um método caro não degrada o p99 dos baratos"""
+        print("\n=== TESTANDO: Limite de Requisições (429) ===")
+        
+        num_amostras = 200  # p99 de 200 amostras não é só o máximo
+        trabalhadores = 8
+        fator_p99 = 3.0  # p99 sob inundação pode crescer até 3x a linha de base...
+        folga_p99 = 0.05  # ...ou 50ms, o que for maior (ruído de rede/escalonamento)
+        recarga_balde = 3  # Segundos para o balde da API (30 fichas, 10/s) encher de novo
+        
+        def medir_imc() -> Tuple[float, Dict[str, Any]]:
+            inicio = time.perf_counter()
+            response = self.make_request({"metodo": "calcular_imc", "peso": 70, "altura": 1.75})
+            return time.perf_counter() - inicio, response
+        
+        # Linha de base: latência das chamadas baratas sem concorrência
+        base = []
+        for _ in range(num_amostras):
+            base.append(medir_imc()[0])
+            time.sleep(DELAY_BETWEEN_TESTS)
+        
+        # Aguarda o balde de calcular_imc recarregar para medir só o efeito da inundação
+        time.sleep(recarga_balde)
+        
+        # Inunda verificar_primo com o maior primo abaixo do limite (custo máximo),
+        # a partir de outro processo
+        contexto = multiprocessing.get_context("spawn")
+        pronto, parar, fila = contexto.Event(), contexto.Event(), contexto.Queue()
+        processo = contexto.Process(target=inundar_alvos, args=(
+            self.alvos, {"metodo": "verificar_primo", "numero": MAIOR_PRIMO_ABAIXO_LIMITE},
+            trabalhadores, pronto, parar, fila))
+        processo.start()
+        
+        sob_carga = []
+        baratas_ok = 0
+        try:
+            if not pronto.wait(timeout=30):
+                print("  Aviso: processo de inundação não iniciou em 30s")
+            for _ in range(num_amostras):
+                latencia, response = medir_imc()
+                sob_carga.append(latencia)
+                if response["success"] and response["data"] and response["data"].get("sucesso"):
+                    baratas_ok += 1
+                time.sleep(DELAY_BETWEEN_TESTS)
+        finally:
+            parar.set()
+            try:
+                enviadas, limitadas, envelope_ok = fila.get(timeout=self.timeout + 30)
+            except queue.Empty:
+                enviadas, limitadas, envelope_ok = 0, 0, False  # Processo morreu sem resumo
+            processo.join()
+        
+        passed = limitadas > 0 and envelope_ok
+        self.add_result("Limite: Inundação de verificar_primo", passed,
+                       f"{limitadas}/{enviadas} requisições limitadas (429)",
+                       f"Envelope e Retry-After válidos={envelope_ok}")
+        
+        # As chamadas baratas continuam sendo admitidas...
+        passed = baratas_ok == num_amostras
+        self.add_result("Limite: calcular_imc admitido durante inundação", passed,
+                       f"{baratas_ok}/{num_amostras} sucesso")
+        
+        # ...e com p99 estável
+        p99_base = percentil(base, 99)
+        p99_carga = percentil(sob_carga, 99)
+        limite = max(p99_base * fator_p99, p99_base + folga_p99)
+        passed = p99_carga <= limite
+        self.add_result("Limite: p99 de calcular_imc estável", passed,
+                       f"p99 {p99_base*1000:.0f}ms -> {p99_carga*1000:.0f}ms",
+                       f"Limite={limite*1000:.0f}ms, p50 base={percentil(base, 50)*1000:.0f}ms, "
+                       f"p50 carga={percentil(sob_carga, 50)*1000:.0f}ms")
+    
     def run_all_tests(self):
         """Executa todos os testes"""
         print("=" * 70)
         print("INICIANDO BATERIA COMPLETA DE TESTES DA API")
         print("=" * 70)
-        print(f"URL: {API_URL}")
+        for alvo in self.alvos:
+            print(f"URL: {alvo}")
         print(f"Timeout: {TIMEOUT}s")
         print("=" * 70)
         
@@ -711,23 +1450,44 @@ class APITester:
         
         try:
             # Testes gerais
-            self.test_no_method()
-            self.test_invalid_method()
+            self.executar_suite(self.test_no_method)
+            self.executar_suite(self.test_invalid_method)
             
             # Testes específicos de cada método
-            self.test_calcular_imc()
-            self.test_verificar_primo()
-            self.test_fibonacci()
-            self.test_analisar_senha()
+            self.executar_suite(self.test_calcular_imc)
+            self.executar_suite(self.test_verificar_primo)
+            self.executar_suite(self.test_fibonacci)
+            self.executar_suite(self.test_analisar_senha)
             
             # Testes de HTTP
-            self.test_http_methods()
+            self.executar_suite(self.test_http_methods)
             
             # Testes de stress
-            self.test_stress()
+            self.executar_suite(self.test_stress)
+            
+            # Teste do limitador (opcional: inunda o alvo com requisições concorrentes)
+            if self.testar_limite:
+                self.executar_suite(self.test_rate_limit, perfilar=False)
             
             # Testes de caracteres especiais
-            self.test_special_characters()
+            self.executar_suite(self.test_special_characters)
+            
+            # Testes de falhas de rede (opcional)
+            if self.testar_falhas:
+                self.executar_suite(self.test_falhas_rede, perfilar=False)
+            
+            # Comparação entre alvos
+            if len(self.alvos) > 1:
+                passed = not self.divergencias
+                self.add_result("Alvos: Envelopes idênticos", passed,
+                               f"{len(self.divergencias)} requisição(ões) divergente(s) entre {len(self.alvos)} alvos")
+            
+            # Comparação com as respostas de ouro
+            if self.ouro is not None and not self.abencoar:
+                passed = not self.divergencias_ouro
+                self.add_result("Ouro: Envelopes idênticos às respostas gravadas", passed,
+                               f"{self.ouro_conferidas - len(self.divergencias_ouro)}/{self.ouro_conferidas} idênticas, "
+                               f"{self.ouro_ausentes} sem resposta gravada")
             
         except KeyboardInterrupt:
             print("\n\n⚠️ Testes interrompidos pelo usuário")
@@ -735,6 +1495,8 @@ class APITester:
             print(f"\n\n❌ Erro fatal durante testes: {e}")
         
         elapsed = time.time() - start_time
+        if self.ouro is not None:
+            self.ouro.fechar()
         
         # Relatório final
         self.print_report(elapsed)
@@ -751,6 +1513,15 @@ class APITester:
         print(f"⏱️  Tempo total: {elapsed_time:.2f}s")
         print(f"⚡ Taxa média: {self.total_tests/elapsed_time:.2f} testes/s")
         
+        if len(self.alvos) > 1:
+            self.print_comparacao_alvos()
+        
+        if self.perfis:
+            self.print_perfil()
+        
+        if self.ouro is not None:
+            self.print_ouro()
+        
         # Lista testes falhados
         if self.failed_tests > 0:
             print("\n" + "=" * 70)
@@ -769,13 +1540,97 @@ class APITester:
         else:
             print(f"⚠️  {self.failed_tests} TESTE(S) FALHARAM")
         print("=" * 70)
+    
+    def print_ouro(self):
+        """Imprime o resumo das respostas de ouro e as diferenças byte a byte"""
+        print("\n" + "=" * 70)
+        print(f"RESPOSTAS DE OURO ({self.ouro.caminho})")
+        print("=" * 70)
+        if self.abencoar:
+            print(f"{self.ouro_gravadas} resposta(s) abençoada(s)")
+            return
+        
+        print(f"Conferidas: {self.ouro_conferidas}, divergentes: {len(self.divergencias_ouro)}, "
+              f"sem resposta gravada: {self.ouro_ausentes}")
+        for requisicao, diff in self.divergencias_ouro[:MAX_DIVERGENCIAS_EXIBIDAS]:
+            print(f"\n≠ {requisicao}")
+            print(f"  {diff}")
+        if len(self.divergencias_ouro) > MAX_DIVERGENCIAS_EXIBIDAS:
+            print(f"\n... e mais {len(self.divergencias_ouro) - MAX_DIVERGENCIAS_EXIBIDAS}")
+        if self.ouro_ausentes:
+            print("\nPara gravar as respostas atuais como referência, rode novamente com --abencoar")
+    
+    def print_perfil(self):
+        """Imprime o custo do cliente por suíte (modo perfil)"""
+        print("\n" + "=" * 70)
+        print(f"PERFIL DO CLIENTE (arquivos .prof e .folded em {self.perfil})")
+        print("=" * 70)
+        print("rede = tempo com ao menos uma requisição aguardando cabeçalhos (servidor + rede)")
+        print("cliente = tempo - rede (harness, requests, pausas entre testes); CPU sem profilers")
+        print(f"{'Suíte':<26} {'req':>5} {'tempo s':>8} {'rede s':>7} {'cliente s':>9} {'CPU s':>6} "
+              f"{'CPU/req ms':>10} {'pico MB':>8}")
+        for p in self.perfis:
+            print(f"{p['suite']:<26} {p['requisicoes']:>5} {p['tempo']:>8.2f} {p['rede']:>7.2f} "
+                  f"{p['cliente']:>9.2f} {p['cpu']:>6.2f} {p['cpu_por_requisicao']*1000:>10.2f} "
+                  f"{p['pico_memoria']/1e6:>8.2f}")
+    
+    def print_comparacao_alvos(self):
+        """Imprime latências lado a lado e as divergências de comportamento entre alvos"""
+        print("\n" + "=" * 70)
+        print("LATÊNCIA POR ALVO (ms)")
+        print("=" * 70)
+        print(f"{'Alvo':<40} {'n':>5} {'erros':>5} {'p50':>7} {'p90':>7} {'p99':>7} {'máx':>7}")
+        for alvo, latencias in self.latencias.items():
+            colunas = [percentil(latencias, p) * 1000 for p in (50, 90, 99, 100)]
+            print(f"{alvo[-40:]:<40} {len(latencias):>5} {self.erros_alvo[alvo]:>5} "
+                  + " ".join(f"{c:>7.1f}" for c in colunas))
+        
+        if self.divergencias:
+            print("\n" + "=" * 70)
+            print(f"DIVERGÊNCIAS ENTRE ALVOS: {len(self.divergencias)}")
+            print("=" * 70)
+            for requisicao, respostas in self.divergencias[:MAX_DIVERGENCIAS_EXIBIDAS]:
+                print(f"\n≠ {requisicao}")
+                for alvo, response in respostas.items():
+                    envelope = response["data"] if response["success"] else f"Erro: {response['error']}"
+                    print(f"  {alvo}: [{response.get('status_code', '-')}] {envelope}")
+            if len(self.divergencias) > MAX_DIVERGENCIAS_EXIBIDAS:
+                print(f"\n... e mais {len(self.divergencias) - MAX_DIVERGENCIAS_EXIBIDAS}")
 
 
 def main():
     """Função principal"""
+    parser = argparse.ArgumentParser(description="Bateria de testes da API de caixa preta")
+    parser.add_argument("--todos-casos", action="store_true",
+                        help="executa as tabelas completas em vez da cobertura mínima por ramo")
+    parser.add_argument("--sem-reducao", action="store_true",
+                        help="não reduz as entradas dos casos que falham")
+    parser.add_argument("--falhas", action="store_true",
+                        help="roda a suíte de falhas de rede através do proxy local (proxy_falhas.py)")
+    parser.add_argument("--limite", action="store_true",
+                        help="roda a suíte que inunda verificar_primo para testar o limite de requisições (429)")
+    parser.add_argument("--perfil", metavar="DIR",
+                        help="perfila cada suíte (cProfile, tracemalloc, pilhas colapsadas) e grava em DIR")
+    parser.add_argument("--ouro", metavar="ARQUIVO",
+                        help="compara cada resposta com as respostas de ouro gravadas (SQLite)")
+    parser.add_argument("--abencoar", action="store_true",
+                        help="com --ouro: grava as respostas atuais como novas respostas de ouro")
+    parser.add_argument("--alvo", action="append", dest="alvos", metavar="URL",
+                        help="URL da API (repita para comparar vários alvos; o primeiro é a referência)")
+    args = parser.parse_args()
+    if args.abencoar and not args.ouro:
+        parser.error("--abencoar exige --ouro ARQUIVO")
+    
     print("\nBATERIA DE TESTES - API DE CAIXA PRETA\n")
     
-    tester = APITester()
+    tester = APITester(reduzir_casos=not args.todos_casos,
+                       reduzir_falhas=not args.sem_reducao,
+                       alvos=args.alvos,
+                       testar_falhas=args.falhas,
+                       testar_limite=args.limite,
+                       perfil=args.perfil,
+                       ouro=args.ouro,
+                       abencoar=args.abencoar)
     tester.run_all_tests()
     
     # Retorna código de saída apropriado